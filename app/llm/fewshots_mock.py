@@ -1,9 +1,10 @@
 import json
-from functools import partial
+from functools import cached_property, partial
 
 from ..models import SnookerPlayer
 from . import FewShotData
 
+# stdlib json keeps the ", " and ": " separators the few-shot prompt text has always used
 to_json = partial(json.dumps, ensure_ascii=False)
 
 
@@ -14,11 +15,11 @@ class MockFewShotData(FewShotData):
         SnookerPlayer(name="Huuskonen Alexandra", group="L1"),
         SnookerPlayer(name="Suhonen Tanja", group="L1"),
         SnookerPlayer(name="Laaksonen Sinikka", group="L2"),
-        SnookerPlayer(name="Tuomi Kari", group="L2"),
+        SnookerPlayer(name="Tuomi Joonas", group="L2"),
         SnookerPlayer(name="Jauhiainen Mari", group="L2"),
         SnookerPlayer(name="Lankinen Elisabet", group="L2"),
         SnookerPlayer(name="Lahti Mika", group="L3"),
-        SnookerPlayer(name="Kari Yrjö", group="L3"),
+        SnookerPlayer(name="Väisänen Yrjö", group="L3"),
         SnookerPlayer(name="Sjöblom Aukusti", group="L3"),
         SnookerPlayer(name="Kivinen Jarmo", group="L3"),
         SnookerPlayer(name="Tähtinen Anneli", group="L4"),
@@ -27,11 +28,10 @@ class MockFewShotData(FewShotData):
         SnookerPlayer(name="Eskelinen Tapio", group="L4"),
     ]
 
-    @property
+    @cached_property
     def examples(self):
         return [
             {
-                "valid_players": "\n".join([str(plr) for plr in self.players]),
                 "passage": "Huhtala - Andersson 2-1. Breikki 45, Huhtala.",
                 "output": to_json(
                     {
@@ -52,7 +52,6 @@ class MockFewShotData(FewShotData):
                 ),
             },
             {
-                "valid_players": "\n".join([str(plr) for plr in self.players]),
                 "passage": "Sinikka - Joonas 2-0",
                 "output": to_json(
                     {
@@ -68,7 +67,6 @@ class MockFewShotData(FewShotData):
                 ),
             },
             {
-                "valid_players": "\n".join([str(plr) for plr in self.players]),
                 "passage": "Valtteri v Anneli 2-1, breaks: Anneli 107, 101, Valtteri 52",
                 "output": to_json(
                     {
@@ -97,7 +95,6 @@ class MockFewShotData(FewShotData):
                 ),
             },
             {
-                "valid_players": "\n".join([str(plr) for plr in self.players]),
                 "passage": "Aukusti v Yrjö 2-1, breikit Aukusti 25, Yrjö 18",
                 "output": to_json(
                     {
@@ -122,8 +119,7 @@ class MockFewShotData(FewShotData):
                 ),
             },
             {
-                "valid_players": "\n".join([str(plr) for plr in self.players]),
-                "passage": "Ahonen 2 - Tero 1, ei breikkejä",
+                "passage": "Tähtinen 2 - Tero 1, ei breikkejä",
                 "output": to_json(
                     {
                         "group": "L4",
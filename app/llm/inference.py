@@ -1,10 +1,10 @@
 """LLM interface."""
 
-import json
 import logging
 import os
 from typing import Literal
 
+import orjson
 from langchain.callbacks import StdOutCallbackHandler
 from langchain.chains.llm import LLMChain
 from langchain_google_vertexai import VertexAI
@@ -37,18 +37,31 @@ class SnookerScoresLLM:
         if not prompt:
             prompt = prompts.get_prompt()
         self.prompt = prompt
+        self.chain = LLMChain(llm=self.llm, prompt=self.prompt, verbose=self.verbose, callbacks=[stdout_handler])
 
     def infer(self, passage: str, valid_players_txt: str) -> dict:
-        chain = LLMChain(llm=self.llm, prompt=self.prompt, verbose=self.verbose, callbacks=[stdout_handler])
-        output = chain.invoke(
-            {
-                "passage": passage,
-                "players_list": valid_players_txt,
-            }
-        )
+        return orjson.loads(self.infer_json(passage, valid_players_txt))
+
+    def infer_json(self, passage: str, valid_players_txt: str) -> str:
+        """Returns the raw JSON text produced by the LLM, for validating straight into a match model."""
+        output = self.chain.invoke(self._inputs(passage, valid_players_txt))
+        return self._output_text(output)
+
+    async def ainfer_json(self, passage: str, valid_players_txt: str) -> str:
+        """Async variant of `infer_json` that awaits the LLM without holding a worker thread."""
+        output = await self.chain.ainvoke(self._inputs(passage, valid_players_txt))
+        return self._output_text(output)
+
+    @staticmethod
+    def _inputs(passage: str, valid_players_txt: str) -> dict:
+        return {
+            "passage": passage,
+            "players_list": valid_players_txt,
+        }
+
+    def _output_text(self, output: dict) -> str:
         try:
             logging.info(f"{self.llm.__class__.__name__} output: {output['text']}")
-            deserialized = json.loads(output["text"])
+            return output["text"]
         except KeyError as e:
             raise RuntimeError(f"Unexpected output from LLM: {output}") from e
-        return deserialized
@@ -2,10 +2,12 @@
 """Prompt and few-shot example generation."""
 
 import logging
+from functools import lru_cache
 
-from langchain.prompts.few_shot_with_templates import FewShotPromptWithTemplates
 from langchain.prompts.prompt import PromptTemplate
 
+from ..models import players_llm_txt
+
 try:
     from . import fewshots_groove
     few_shot_data = fewshots_groove.GrooveFewShotData()
@@ -16,10 +18,7 @@ except ImportError:
 
 
 
-def get_prompt():
-    """Generates prompt to LLM containing instruction, few-shot examples and placeholder for user input."""
-
-    prompt_prefix = """The following passage contains the outcome of a snooker match.
+PROMPT_PREFIX = """The following passage contains the outcome of a snooker match.
     The passage is about a match between two players containing frames won by each player and, optionally, any notable
     breaks.
 
@@ -34,22 +33,44 @@ def get_prompt():
     If a break is not explicitly mentioned in the passage, return an empty list for breaks.
 
     Also, if it seems certain that the passage is in English, output `language` as "eng", otherwise assume "fin".
+
+    Valid players in the examples below:
+    {{ example_players | indent(4) }}
     """
 
-    return FewShotPromptWithTemplates(
-        examples=few_shot_data.examples,
-        example_prompt=PromptTemplate(
-            template="Valid players:\n{{ players_list }}\n\nPassage: {{ passage }}\n\nJSON: {{ output }}\n",
-            input_variables=["players_list", "passage", "output"],
-            template_format="jinja2",
-        ),
-        input_variables=["players_list", "passage"],
-        prefix=PromptTemplate(template=prompt_prefix, input_variables=[], template_format="jinja2"),
-        suffix=PromptTemplate(
-            template="Valid players:\n{{ players_list }}\n\nPassage: {{ passage }}\n\nJSON:",
-            input_variables=["players_list", "passage"],
-            template_format="jinja2",
-        ),
+# templates are parsed once at import and shared by every prompt
+_EXAMPLE_PROMPT = PromptTemplate(
+    template="Passage: {{ passage }}\n\nJSON: {{ output }}\n",
+    input_variables=["passage", "output"],
+    template_format="jinja2",
+)
+# the examples share one roster, so it is sent once in the prefix rather than with every example
+_PREFIX_TEMPLATE = PromptTemplate(
+    template=PROMPT_PREFIX,
+    input_variables=[],
+    partial_variables={"example_players": players_llm_txt(few_shot_data.players)},
+    template_format="jinja2",
+)
+_SUFFIX_TEMPLATE = PromptTemplate(
+    template="Valid players:\n{{ players_list }}\n\nPassage: {{ passage }}\n\nJSON:",
+    input_variables=["players_list", "passage"],
+    template_format="jinja2",
+)
+
+
+@lru_cache(maxsize=1)
+def get_prompt():
+    """Generates prompt to LLM containing instruction, few-shot examples and placeholder for user input.
+
+    The instruction and examples never change, so they are rendered once here and only the suffix is filled in
+    per request."""
+    few_shot_text = "\n\n".join(
+        [_PREFIX_TEMPLATE.format(), *(_EXAMPLE_PROMPT.format(**example) for example in few_shot_data.examples)]
+    )
+    return PromptTemplate(
+        template="{{ few_shot_text }}\n\n" + _SUFFIX_TEMPLATE.template,
+        input_variables=_SUFFIX_TEMPLATE.input_variables,
+        partial_variables={"few_shot_text": few_shot_text},
         template_format="jinja2",
     )
 
@@ -1,24 +1,27 @@
 """FastAPI app for recording snooker match outcomes reported by users."""
 
-import json
+import asyncio
 import logging
 import os
 import sys
+from functools import lru_cache
 
 import google.cloud.logging
-from fastapi import Depends, FastAPI, HTTPException, Request, status
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, RedirectResponse
+import orjson
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
 from pydantic import ValidationError
 
 from app.llm.inference import SnookerScoresLLM
-from app.models import get_match_model
+from app.models import SnookerMatch
 from app.settings import get_settings, messages
-from app.sheets import SnookerSheet
-from app.twilio_client import Twilio, TwilioInboundMessage
+from app.sheets import get_sheet
+from app.twilio_client import Twilio, TwilioInboundMessage, parse_twilio_msg, twiml_reply
 
 DEBUG = bool(os.environ.get("SNOOKER_DEBUG", False))
 SETTINGS = get_settings()
+SETTINGS_SIXRED24 = get_settings(sixred24=True)
 
 
 def setup_logging():
@@ -30,25 +33,36 @@ def setup_logging():
         logging.getLogger().setLevel(logging.INFO)
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
-async def parse_twilio_msg(req: Request) -> TwilioInboundMessage:
-    """Returns inbound Twilio message details from request form data"""
-    # expect application/x-www-form-urlencoded
-    if req.headers["Content-Type"] != "application/x-www-form-urlencoded":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Type")
-    form_data = await req.form()
-    body = form_data.get("Body")
-    sender = form_data.get("From")
-    # set is_test to True if the message contains TEST
-    is_test = bool(body and "TEST" in body)
-    if not body or not sender:
-        raise HTTPException(status_code=400, detail="Invalid Twilio message")
-    return TwilioInboundMessage(body=body, sender=sender, is_test=is_test)
+twilio = Twilio()
 
 
-twilio = Twilio()
+@lru_cache(maxsize=None)
+def get_llm(llm: str) -> SnookerScoresLLM:
+    """Returns the shared LLM client for `llm`, creating it on first use."""
+    return SnookerScoresLLM(llm=llm)
+
+
+def get_players(sheetid: str) -> tuple[list, str]:
+    """Returns the current players of a sheet and their prompt text."""
+    return get_sheet(sheetid).current_roster()
+
+
+async def prefetch_players(sheetid: str):
+    """Warms the roster cache so the first messages do not wait on Google Sheets."""
+    try:
+        await asyncio.to_thread(get_players, sheetid)
+    except Exception:
+        logging.exception("Could not prefetch players for sheet %s", sheetid)
+
+
+@app.on_event("startup")
+async def startup():
+    # awaited, as Cloud Run only guarantees CPU during startup and while handling requests
+    await asyncio.gather(*(prefetch_players(settings.SHEETID) for settings in (SETTINGS, SETTINGS_SIXRED24)))
 
 
 @app.post("/scores")
@@ -64,40 +78,55 @@ async def post_scores_sixred24(
     msg=Depends(parse_twilio_msg),
 ):
     """Handles inbound scores for SixRed24 league."""
-    return await handle_scores(settings=get_settings(sixred24=True), msg=msg)
+    return await handle_scores(settings=SETTINGS_SIXRED24, msg=msg)
 
 
 async def handle_scores(msg: TwilioInboundMessage, settings):
-    sheet = SnookerSheet(settings.SHEETID)
-    llm = SnookerScoresLLM(llm=settings.LLM)
     """Handles inbound scores"""
     logging.info("Received message from %s: %s", msg.sender, msg.body)
-    valid_players = sheet.current_players
+    # Sheets and LLM clients block, so look up the independent roster and LLM client concurrently off the event loop
+    (valid_players, players_txt), llm = await asyncio.gather(
+        asyncio.to_thread(get_players, settings.SHEETID),
+        asyncio.to_thread(get_llm, settings.LLM),
+    )
+    match_model = SnookerMatch.configure_model(valid_players=valid_players, max_score=settings.MAX_SCORE)
+    output: str = await llm.ainfer_json(passage=msg.body, valid_players_txt=players_txt)
     try:
-        output: dict = llm.infer(passage=msg.body, valid_players_txt=sheet.players_txt)
-        snooker_match = get_match_model(valid_players=valid_players, max_score=settings.MAX_SCORE, **output)
+        # parse and validate the LLM output in one pass in pydantic-core
+        snooker_match = match_model.model_validate_json(output)
     except ValidationError as err:
-        twilio.send_message(msg.sender, messages.INVALID)
-        error_messages: list[str] = [err.get("msg") for err in err.errors()]
+        errors = err.errors(include_url=False, include_context=False, include_input=False)
+        error_messages: list[str] = [error["msg"] for error in errors]
         detail = {"llm_output": output, "error_messages": error_messages}
-        logging.error(json.dumps(detail))
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail)
-    sheet.record_match(values=snooker_match.model_dump(), passage=msg.body, sender=msg.sender)
-    for break_ in snooker_match.breaks:
-        sheet.record_break(break_.model_dump(), passage=msg.body, sender=msg.sender)
+        logging.error(orjson.dumps(detail).decode())
+        # reply in the webhook response itself, saving a roundtrip to the Twilio REST API
+        return Response(content=twiml_reply(messages.INVALID), media_type="application/xml")
+    await asyncio.to_thread(
+        get_sheet(settings.SHEETID).record_match_with_breaks,
+        values=snooker_match.model_dump(),
+        breaks=[break_.model_dump() for break_ in snooker_match.breaks],
+        passage=msg.body,
+        sender=msg.sender,
+    )
     reply = snooker_match.summary(snooker_match.passage_language)
-    twilio.send_message(msg.sender, reply)
+    # Cloud Run throttles CPU once the response is sent, so the reply is sent before returning
+    try:
+        await asyncio.to_thread(twilio.send_message, msg.sender, reply)
+    except Exception:
+        # the match is already recorded, so a failed reply must not make the sender resend it
+        logging.exception("Could not send reply to %s", msg.sender)
     reply_msg = "Match tested" if msg.is_test else "Match recorded"
-    content = {"status": reply_msg, "match": jsonable_encoder(snooker_match)}
-    logging.info(json.dumps(content))
-    return JSONResponse(status_code=status.HTTP_201_CREATED, content=content)
+    # encode once and use the same bytes for the log and the response body
+    content = orjson.dumps({"status": reply_msg, "match": snooker_match.model_dump(mode="json")})
+    logging.info(content.decode())
+    return Response(content=content, status_code=status.HTTP_201_CREATED, media_type="application/json")
 
 
 @app.exception_handler(Exception)
 async def handle_exception(req: Request, exc: Exception):
+    """Logs unhandled errors. HTTPExceptions are answered earlier by Starlette's ExceptionMiddleware."""
     logging.exception(exc)
-    if not isinstance(exc, HTTPException):
-        return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
 
 
 setup_logging()
@@ -1,9 +1,12 @@
 import datetime
-from typing import ClassVar, Literal, Optional, Union
+from functools import cached_property, lru_cache
+from operator import attrgetter
+from typing import ClassVar, Iterable, Literal, Optional, Union
 
-from jinja2 import Template
 from pydantic import (
+    AliasChoices,
     BaseModel,
+    ConfigDict,
     computed_field,
     create_model,
     field_validator,
@@ -12,12 +15,14 @@ from pydantic import (
 )
 from pydantic.fields import Field
 
-from .settings import get_settings
+from .settings import get_messages, get_settings
 
 settings = get_settings(sixred24=False)  # TODO: DRY
 
 
 class SnookerPlayer(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     group: str
 
@@ -32,25 +37,28 @@ class SnookerPlayer(BaseModel):
         """Returns only the name when serializing the model"""
         return self.name
 
-    @property
+    @cached_property
     def first_name(self) -> str:
         """Returns the first name if there is one, otherwise returns the full name.
 
         In the data, names are formatted as "Last First".
         """
-        return self.name.split()[-1] if len(self.name.split()) > 1 else self.name
+        parts = self.name.rsplit(None, 1)
+        return parts[1] if len(parts) > 1 else self.name
+
 
-    @property
-    def __llm_str__(self) -> str:
-        """Returns the group and name in the format "Group: Name".
+def players_llm_txt(players: Iterable[SnookerPlayer]) -> str:
+    """Returns the players one per line, in the format "Group: Name".
 
-        This is used in LLM prompts."""
-        return f"{self.group}: {self.name}"
+    This is used in LLM prompts."""
+    return "\n".join(f"{plr.group}: {plr.name}" for plr in players)
 
 
 class SnookerBreak(BaseModel):
     """Snooker break"""
 
+    model_config = ConfigDict(frozen=True)
+
     date: Optional[datetime.date] = Field(default_factory=datetime.date.today)
     player: SnookerPlayer = Field(default_factory=SnookerPlayer)
     points: int = Field(gt=0, le=147)
@@ -70,8 +78,14 @@ class SnookerMatch(BaseModel):
     # model configuration at runtime
     valid_players: ClassVar[list[SnookerPlayer]]
     max_score: ClassVar[int] = 2
+    # indexes over valid_players, built once per configured model
+    players_by_name: ClassVar[dict[str, SnookerPlayer]] = {}
+    valid_player_set: ClassVar[frozenset[SnookerPlayer]] = frozenset()
 
-    passage_language: Optional[Literal["fin", "eng"]] = "fin"
+    # the LLM reports the passage language as `language`
+    passage_language: Optional[Literal["fin", "eng"]] = Field(
+        "fin", validation_alias=AliasChoices("passage_language", "language")
+    )
 
     @computed_field
     def winner(self) -> str:
@@ -81,15 +95,20 @@ class SnookerMatch(BaseModel):
             return self.player1
         return self.player2
 
+    @cached_property
+    def best_break(self) -> Optional[SnookerBreak]:
+        """Returns the highest break, found in a single pass"""
+        return max(self.breaks, key=attrgetter("points"), default=None)
+
     @computed_field
     def highest_break(self) -> Optional[int]:
         """Returns the highest break"""
-        return max((b.points for b in self.breaks), default=None)
+        return self.best_break.points if self.best_break else None
 
     @computed_field
     def highest_break_player(self) -> Optional[SnookerPlayer]:
         """Returns the player with the highest break"""
-        return max(self.breaks, key=lambda b: b.points, default=None).player if self.breaks else None
+        return self.best_break.player if self.best_break else None
 
     @field_validator("player1_score", "player2_score")
     def valid_score(cls, score):
@@ -98,11 +117,23 @@ class SnookerMatch(BaseModel):
         assert score <= cls.max_score, f"score must be less than or equal to {cls.max_score}"
         return score
 
+    @field_validator("breaks", mode="before")
+    def lookup_break_players(cls, breaks):
+        """Look up break players given by name, e.g. when validating LLM output directly"""
+        if breaks is None:
+            return []
+        return [
+            {**b, "player": cls.players_by_name.get(b["player"])}
+            if isinstance(b, dict) and isinstance(b.get("player"), str)
+            else b
+            for b in breaks
+        ]
+
     @field_validator("player1", "player2")
     def lookup_players(cls, player):
         """Look up the player if it is a string"""
         if isinstance(player, str):
-            return next((p for p in cls.valid_players if p.name == player), None)
+            return cls.players_by_name.get(player)
         return player
 
 
@@ -115,8 +146,8 @@ class SnookerMatch(BaseModel):
         """
 
         # Check that both players are in the list of valid players
-        assert self.player1 in self.valid_players, f"Player '{self.player1}' is not a valid player"
-        assert self.player2 in self.valid_players, f"Player '{self.player2}' is not a valid player"
+        assert self.player1 in self.valid_player_set, f"Player '{self.player1}' is not a valid player"
+        assert self.player2 in self.valid_player_set, f"Player '{self.player2}' is not a valid player"
 
         # Check that the group of the match is the same as the group of the players
         assert self.group == self.player1.group, f"Player '{self.player1}' is not in group {self.group}"
@@ -131,70 +162,57 @@ class SnookerMatch(BaseModel):
     @model_validator(mode="after")
     def breaks_are_by_match_players(self):
         """Breaks have to be by one of the match players"""
+        players = (self.player1, self.player2)
         for b in self.breaks:
-            assert b.player in [self.player1, self.player2], f"{b.player} is not a player in this match"
+            assert b.player in players, f"{b.player} is not a player in this match"
         return self
 
     def summary(self, lang="fin") -> str:
         """Returns a string representation of the match."""
 
-        winner = self.winner
-        loser = self.player1 if self.player1_score < self.player2_score else self.player2
-        winner_score = self.player1_score if self.player1_score > self.player2_score else self.player2_score
-        loser_score = self.player1_score if self.player1_score < self.player2_score else self.player2_score
-
-        TEMPLATES = {
-            "eng": Template(
-                """
-{%- if match.player1_score == match.player2_score -%}
-    Match between {{ player1 }} and {{ player2 }} ended in a draw at {{ player1_score }} frames each.
-{%- else -%}
-    {{ winner }} won {{ loser }} by {{ winner_score }} frames to {{ loser_score }}.
-{% endif -%} {%- if match.breaks -%}
-    Breaks: {% for b in match.breaks -%} {{ b.player.first_name }} {{ b.points }} {%- if not
-    loop.last %}, {% endif %}{%- endfor -%}.
-{%- endif -%}"""
-            ),
-            "fin": Template(
-                """
-{%- if match.player1_score == match.player2_score -%}
-    {{ player1 }} ja {{ player2 }} pelasivat tasan {{ player1_score }}-{{ player2_score }}.
-{%- else -%}
-    {{ winner }} voitti vastustajan {{ loser }} {{ winner_score }}-{{ loser_score }}.
-{% endif -%} {%- if match.breaks -%}
-    Breikit: {% for b in match.breaks -%} {{ b.player.first_name }} {{ b.points }} {%- if not
-    loop.last %}, {% endif %}{%- endfor -%}.
-{%- endif -%}"""
-            ),
-        }
-
-        # Choose the template based language of the original passage
-        summary = TEMPLATES[lang].render(
-            match=self,
-            player1=self.player1,
-            player2=self.player2,
-            winner=winner,
-            loser=loser,
-            winner_score=winner_score,
-            loser_score=loser_score,
-        )
-
-        sheet_url = settings.SHEET_SHORTLINK
-        link_line = {
-            "eng": f"League standings: {sheet_url}",
-            "fin": f"Sarjataulukko: {sheet_url}",
-        }
-        return f"{summary}\n{link_line[lang]}"
+        messages = get_messages(lang or "fin")
+        result = messages.DRAW if self.player1_score == self.player2_score else messages.WIN
+        lines = [
+            result.format(
+                player1=self.player1,
+                player2=self.player2,
+                player1_score=self.player1_score,
+                player2_score=self.player2_score,
+                winner=self.winner,
+                loser=self.player1 if self.player1_score < self.player2_score else self.player2,
+                winner_score=max(self.player1_score, self.player2_score),
+                loser_score=min(self.player1_score, self.player2_score),
+            )
+        ]
+        if self.breaks:
+            breaks = ", ".join(f"{b.player.first_name} {b.points}" for b in self.breaks)
+            lines.append(messages.BREAKS.format(breaks=breaks))
+        lines.append(messages.STANDINGS.format(url=settings.SHEET_SHORTLINK))
+        return "\n".join(lines)
 
     @classmethod
     def configure_model(cls, valid_players: list[SnookerPlayer], max_score: Optional[int] = 2) -> "SnookerMatch":
-        """Returns a version of the model with valid players set at runtime."""
-        return create_model(
-            cls.__name__,
-            __base__=cls,
-            valid_players=valid_players,
-            max_score=max_score,
-        )
+        """Returns a version of the model with valid players set at runtime.
+
+        Configured models are cached per roster and max score, so each schema is only built once."""
+        return _configured_model(cls, tuple((p.name, p.group) for p in valid_players), max_score)
+
+
+@lru_cache(maxsize=8)
+def _configured_model(base: type[SnookerMatch], players: tuple[tuple[str, str], ...], max_score: int):
+    valid_players = [SnookerPlayer(name=name, group=group) for name, group in players]
+    players_by_name = {}
+    for player in valid_players:
+        # like a linear search, the first player listed wins when a name appears in several groups
+        players_by_name.setdefault(player.name, player)
+    return create_model(
+        base.__name__,
+        __base__=base,
+        valid_players=valid_players,
+        max_score=max_score,
+        players_by_name=players_by_name,
+        valid_player_set=frozenset(valid_players),
+    )
 
 
 # TODO: decouple model customization and model instantiation
@@ -221,7 +239,7 @@ def get_match_model(valid_players: list[SnookerPlayer], max_score: Optional[int]
 
     breaks = []
     for b in inputs.get("breaks", []):
-        player = next((player for player in valid_players if player.name == b.get("player")), None)
+        player = match_model.players_by_name.get(b.get("player"))
         breaks.append(SnookerBreak(player=player, points=b.get("points")))
 
     return match_model(
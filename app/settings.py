@@ -5,10 +5,18 @@ from typing import Union
 
 class EngMessages:
     INVALID = "Sorry, I could not understand the message."
+    DRAW = "Match between {player1} and {player2} ended in a draw at {player1_score} frames each."
+    WIN = "{winner} won {loser} by {winner_score} frames to {loser_score}."
+    BREAKS = "Breaks: {breaks}."
+    STANDINGS = "League standings: {url}"
 
 
 class FinMessages:
     INVALID = "En ymmärtänyt viestiä, pahoittelut."
+    DRAW = "{player1} ja {player2} pelasivat tasan {player1_score}-{player2_score}."
+    WIN = "{winner} voitti vastustajan {loser} {winner_score}-{loser_score}."
+    BREAKS = "Breikit: {breaks}."
+    STANDINGS = "Sarjataulukko: {url}"
 
 
 def get_messages(lang: str) -> Union[FinMessages, EngMessages]:
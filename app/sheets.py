@@ -1,7 +1,10 @@
 """Google sheets API client for managing snooker scores."""
 
+import logging
 import os
+import time
 from datetime import datetime
+from functools import lru_cache
 from itertools import combinations
 from typing import List, Tuple
 
@@ -10,10 +13,13 @@ import gspread
 import gspread.utils
 import pytz
 
-from .models import SnookerMatch, SnookerPlayer
+from .models import SnookerMatch, SnookerPlayer, players_llm_txt
 
 CURDIR = os.path.dirname(os.path.abspath(__file__))
 SHEETS_DATE_FORMAT = "%d.%m.%Y"
+PLAYERS_TTL = 300  # seconds before the player list is re-read from the sheet
+ROUND_TTL = 300  # seconds before the current round is re-read from the sheet
+WRITE_ATTEMPTS = 3  # tries per append before a write fails
 
 
 def get_helsinki_timestamp():
@@ -28,7 +34,16 @@ def try_parse_date(date_str: str):
         return None
 
 
+@lru_cache(maxsize=None)
+def get_sheet(spreadsheet_id: str) -> "SnookerSheet":
+    """Returns the shared SnookerSheet for `spreadsheet_id`, opening it on first use."""
+    return SnookerSheet(spreadsheet_id)
+
+
 class SnookerSheet:
+    _current_round: Tuple[float, int] = None  # (expiry, round)
+    _roster: Tuple[float, List[SnookerPlayer], str] = None  # (expiry, players, players_txt)
+
     def __init__(self, spreadsheet_id: str):
         credentials, project_id = google.auth.default(
             scopes=[
@@ -37,6 +52,7 @@ class SnookerSheet:
             ]
         )
         self.client = gspread.authorize(credentials)
+        self.spreadsheet_id = spreadsheet_id
         self.ss = self.client.open_by_key(spreadsheet_id)
 
         # assert that well-known assets exist
@@ -56,7 +72,14 @@ class SnookerSheet:
 
     @property
     def current_round(self) -> int:
-        """Get the current round number."""
+        """Get the current round number, re-reading it from the spreadsheet at most every ROUND_TTL seconds."""
+        now = time.monotonic()
+        if self._current_round is None or now >= self._current_round[0]:
+            self._current_round = (now + ROUND_TTL, self.fetch_current_round())
+        return self._current_round[1]
+
+    def fetch_current_round(self) -> int:
+        """Get the current round number from spreadsheet."""
         rounds = self.ss.values_get("nr_rounds").get("values")
         today = datetime.now().date()
         for r in sorted(rounds, key=lambda x: int(x[0]), reverse=True):
@@ -69,10 +92,30 @@ class SnookerSheet:
 
     @property
     def current_players(self) -> List[SnookerPlayer]:
+        """Get list of current players."""
+        return self.current_roster()[0]
+
+    def current_roster(self) -> Tuple[List[SnookerPlayer], str]:
+        """Get current players and their prompt text, re-reading them from the spreadsheet at most every PLAYERS_TTL
+        seconds.
+
+        Both come from the same read, so a match is validated against the roster the LLM was prompted with."""
+        roster = self._roster
+        if roster is None or time.monotonic() >= roster[0]:
+            roster = self.refresh_players()
+        return roster[1], roster[2]
+
+    def refresh_players(self) -> Tuple[float, List[SnookerPlayer], str]:
+        """Re-read current players from the spreadsheet and replace the cached roster."""
+        players = self.fetch_current_players()
+        self._roster = (time.monotonic() + PLAYERS_TTL, players, players_llm_txt(players))
+        return self._roster
+
+    def fetch_current_players(self) -> List[SnookerPlayer]:
         """Get list of current players from spreadsheet."""
         players_rows = self.ss.values_get("nr_currentPlayers").get("values")
         if not players_rows:
-            return RuntimeError("No players found in spreadsheet")
+            raise RuntimeError("No players found in spreadsheet")
         header_order = ["name", "group"]
         return [
             SnookerPlayer(
@@ -84,8 +127,8 @@ class SnookerSheet:
 
     @property
     def players_txt(self) -> str:
-        """Newline-separated list of current players"""
-        return "\n".join([plr.__llm_str__ for plr in self.current_players])
+        """Current players in the format used in LLM prompts"""
+        return self.current_roster()[1]
 
     def _unhide_all_columns(self, ws: gspread.Worksheet):
         """Unhide all columns in worksheet.
@@ -114,14 +157,12 @@ class SnookerSheet:
             timestamp = datetime.now()
         return (timestamp - datetime(1899, 12, 30).date()).days
 
-    def record_match(self, values: dict, passage: str, sender: str = None):
-        """Record match to spreadsheet"""
-        self._unhide_all_columns(self.matches_sheet)
+    def _match_row(self, values: dict, passage: str, sender: str, current_round: int) -> list:
         timestamp = get_helsinki_timestamp()
         log = r"\r".join([timestamp, str(sender), passage])
-        ordered_values = [
+        return [
             "FROM_TWILIO",
-            self.current_round,
+            current_round,
             values["group"],
             values["player1"],
             values["player2"],
@@ -131,24 +172,74 @@ class SnookerSheet:
             values["winner"],
             log,
         ]
-        self.matches_sheet.append_row(ordered_values)
+
+    def record_match(self, values: dict, passage: str, sender: str = None):
+        """Record match to spreadsheet"""
+        self._unhide_all_columns(self.matches_sheet)
+        self.matches_sheet.append_row(self._match_row(values, passage, sender, self.current_round))
 
         return True
 
-    def record_break(self, break_: dict, passage: str = None, sender: str = None):
-        """Record break to spreadsheet"""
-        self._unhide_all_columns(self.matches_sheet)
+    def _break_row(self, break_: dict, passage: str, sender: str, current_round: int) -> list:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         # excel fields are: timestamp	from	passage	player	break	date    round
-        ordered_values = [
+        return [
             timestamp,
             sender,
             passage,
             break_["player"],
             break_["points"],
             self.days_since_1900(break_["date"]),
-            self.current_round,
+            current_round,
         ]
-        self.breaks_sheet.append_row(ordered_values)
+
+    def record_match_with_breaks(self, values: dict, breaks: List[dict], passage: str, sender: str = None):
+        """Record match and its breaks to spreadsheet.
+
+        The match row is appended before the break rows, and each append is retried on its own."""
+        self._unhide_all_columns(self.matches_sheet)
+        current_round = self.current_round
+        match_row = self._match_row(values, passage, sender, current_round)
+        # the log column (timestamp, sender and passage) identifies the match row
+        self._append_rows_once(self.matches_sheet, [match_row], key_columns=(len(match_row),))
+        if breaks:
+            break_rows = [self._break_row(break_, passage, sender, current_round) for break_ in breaks]
+            # breaks are identified by their timestamp and passage
+            self._append_rows_once(self.breaks_sheet, break_rows, key_columns=(1, 3))
+
+        return True
+
+    @staticmethod
+    def _append_rows_once(ws: gspread.Worksheet, rows: List[list], key_columns: Tuple[int, ...]):
+        """Append rows to worksheet, retrying failed attempts.
+
+        A failed or timed out append may still have been applied, so before each retry the worksheet is searched for
+        the first row's `key_columns` (1-based) and the rows are not appended again if they are found."""
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                if attempt > 1 and SnookerSheet._has_row(ws, rows[0], key_columns):
+                    return
+                ws.append_rows(rows)
+                return
+            except Exception as e:
+                if attempt == WRITE_ATTEMPTS:
+                    raise
+                logging.warning("Appending to worksheet %s failed, retrying: %s", ws.title, e)
+                time.sleep(attempt)
+
+    @staticmethod
+    def _has_row(ws: gspread.Worksheet, row: list, key_columns: Tuple[int, ...]) -> bool:
+        first, *rest = key_columns
+        for cell in ws.findall(str(row[first - 1]), in_column=first):
+            values = ws.row_values(cell.row)
+            if all(len(values) >= col and values[col - 1] == str(row[col - 1]) for col in rest):
+                return True
+        return False
+
+    def record_break(self, break_: dict, passage: str = None, sender: str = None):
+        """Record break to spreadsheet"""
+        self._unhide_all_columns(self.matches_sheet)
+        self.breaks_sheet.append_row(self._break_row(break_, passage, sender, self.current_round))
 
         return True
+
@@ -3,7 +3,7 @@ from functools import partial
 import pytest
 from pydantic import ValidationError
 
-from app.models import SnookerBreak, SnookerMatch, SnookerPlayer, get_match_model
+from app.models import SnookerBreak, SnookerMatch, SnookerPlayer, get_match_model, players_llm_txt
 
 player1 = SnookerPlayer(name="Player Yksi", group="L1")
 player2 = SnookerPlayer(name="Player Kaksi", group="L1")
@@ -119,3 +119,44 @@ def test_match_summary_no_breaks():
 
     assert match.summary("fin").startswith("Player Yksi voitti vastustajan Player Kaksi 2-1.")
     assert match.summary("eng").startswith("Player Yksi won Player Kaksi by 2 frames to 1.")
+
+
+def test_configured_model_is_cached():
+    assert SnookerMatch.configure_model(players, 2) is SnookerMatch.configure_model(list(players), 2)
+    assert SnookerMatch.configure_model(players, 2) is not SnookerMatch.configure_model(players, 3)
+
+
+def test_validate_llm_json():
+    match_model = SnookerMatch.configure_model(valid_players=players, max_score=2)
+    match = match_model.model_validate_json(
+        '{"group": "L1", "player1": "Player Yksi", "player2": "Player Kaksi", "player1_score": 2,'
+        ' "player2_score": 1, "winner": "Player Yksi", "breaks": [{"player": "Player Kaksi", "points": 60}],'
+        ' "language": "eng"}'
+    )
+    assert match.winner == player1
+    assert match.breaks[0].player == player2
+    assert match.passage_language == "eng"
+
+    with pytest.raises(ValidationError):
+        match_model.model_validate_json('{"group": "L1", "breaks": [{"player": "Player Kolme", "points": 60}]}')
+
+
+def test_players_llm_txt():
+    other = SnookerPlayer(name="Player Neljä", group="L2")
+    assert players_llm_txt([player1, other]) == "L1: Player Yksi\nL2: Player Neljä"
+
+
+def test_match_summary_draw():
+    match = match_model_for_testing(
+        group="L1",
+        player1="Player Yksi",
+        player2="Player Kaksi",
+        player1_score=1,
+        player2_score=1,
+        breaks=[{"player": "Player Kaksi", "points": 60}],
+    )
+
+    assert match.summary("eng").startswith(
+        "Match between Player Yksi and Player Kaksi ended in a draw at 1 frames each.\nBreaks: Kaksi 60."
+    )
+    assert match.summary("fin").startswith("Player Yksi ja Player Kaksi pelasivat tasan 1-1.\nBreikit: Kaksi 60.")
@@ -0,0 +1,12 @@
+import json
+
+from app.llm.fewshots_mock import MockFewShotData
+
+
+def test_mock_examples_only_use_listed_players():
+    data = MockFewShotData()
+    names = {plr.name for plr in data.players}
+    for example in data.examples:
+        output = json.loads(example["output"])
+        players = {output["player1"], output["player2"], *(b["player"] for b in output["breaks"])}
+        assert players <= names, example["passage"]
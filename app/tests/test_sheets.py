@@ -0,0 +1,133 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app import sheets
+from app.models import SnookerPlayer
+
+
+class FakeSheet(sheets.SnookerSheet):
+    """SnookerSheet that skips authorization and counts player reads."""
+
+    def __init__(self, spreadsheet_id: str):
+        self.spreadsheet_id = spreadsheet_id
+        self.fetches = 0
+
+    def fetch_current_players(self):
+        self.fetches += 1
+        return [SnookerPlayer(name=f"Player {self.fetches}", group="L1")]
+
+
+def test_current_players_are_cached():
+    sheet = FakeSheet("cached")
+    assert sheet.current_players == sheet.current_players
+    assert sheet.fetches == 1
+
+
+def test_expired_players_are_refreshed(monkeypatch):
+    monkeypatch.setattr(sheets, "PLAYERS_TTL", 0)
+    sheet = FakeSheet("expired")
+    assert sheet.current_roster() == ([SnookerPlayer(name="Player 1", group="L1")], "L1: Player 1")
+    assert sheet.current_roster() == ([SnookerPlayer(name="Player 2", group="L1")], "L1: Player 2")
+    assert sheet.fetches == 2
+
+
+class FakeWorksheet:
+    """Worksheet whose first `failures` appends raise, optionally after the rows were written."""
+
+    title = "fake"
+
+    def __init__(self, failures: int = 0, written_before_failing: bool = False):
+        self.rows = []
+        self.failures = failures
+        self.written_before_failing = written_before_failing
+
+    def unhide_columns(self, start, end):
+        pass
+
+    def append_rows(self, rows):
+        if self.failures:
+            self.failures -= 1
+            if self.written_before_failing:
+                self.rows.extend(rows)
+            raise RuntimeError("Sheets unavailable")
+        self.rows.extend(rows)
+
+    def findall(self, query, in_column):
+        return [SimpleNamespace(row=i) for i, row in enumerate(self.rows, 1) if str(row[in_column - 1]) == query]
+
+    def row_values(self, row):
+        return [str(value) for value in self.rows[row - 1]]
+
+
+class WritableSheet(FakeSheet):
+    def __init__(self, matches: FakeWorksheet, breaks: FakeWorksheet):
+        super().__init__("writable")
+        self._matches, self._breaks = matches, breaks
+        self._current_round = (float("inf"), 1)
+
+    @property
+    def matches_sheet(self):
+        return self._matches
+
+    @property
+    def breaks_sheet(self):
+        return self._breaks
+
+
+MATCH = {
+    "group": "L1",
+    "player1": "A",
+    "player2": "B",
+    "date": datetime.date(2024, 3, 1),
+    "player1_score": 2,
+    "player2_score": 0,
+    "winner": "A",
+}
+BREAKS = [{"player": "A", "points": 50, "date": datetime.date(2024, 3, 1)}]
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(sheets.time, "sleep", lambda seconds: None)
+
+
+def test_failed_break_append_does_not_repeat_match(no_sleep):
+    sheet = WritableSheet(FakeWorksheet(), FakeWorksheet(failures=1))
+    sheet.record_match_with_breaks(MATCH, BREAKS, passage="A - B 2-0, break 50 A", sender="+358")
+    assert len(sheet.matches_sheet.rows) == 1
+    assert len(sheet.breaks_sheet.rows) == 1
+
+
+def test_applied_append_is_not_retried(no_sleep):
+    sheet = WritableSheet(FakeWorksheet(failures=1, written_before_failing=True), FakeWorksheet())
+    sheet.record_match_with_breaks(MATCH, BREAKS, passage="A - B 2-0, break 50 A", sender="+358")
+    assert len(sheet.matches_sheet.rows) == 1
+    assert len(sheet.breaks_sheet.rows) == 1
+
+
+def test_append_raises_after_retries(no_sleep):
+    sheet = WritableSheet(FakeWorksheet(failures=sheets.WRITE_ATTEMPTS), FakeWorksheet())
+    with pytest.raises(RuntimeError):
+        sheet.record_match_with_breaks(MATCH, BREAKS, passage="A - B 2-0", sender="+358")
+    assert sheet.breaks_sheet.rows == []
+
+
+def test_players_txt_follows_players_cache():
+    sheet = FakeSheet("players_txt")
+    assert sheet.players_txt is sheet.players_txt == "L1: Player 1"
+    assert sheet.fetches == 1
+    sheet.refresh_players()
+    assert sheet.players_txt == "L1: Player 2"
+
+
+def test_current_round_is_cached(monkeypatch):
+    sheet = FakeSheet("round")
+    reads = []
+    monkeypatch.setattr(sheet, "fetch_current_round", lambda: reads.append(1) or len(reads))
+    assert sheet.current_round == sheet.current_round == 1
+    monkeypatch.setattr(sheets, "ROUND_TTL", 0)
+    sheet._current_round = None
+    assert sheet.current_round == 2
+    assert sheet.current_round == 3
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.twilio_client import parse_twilio_msg, twiml_reply
+
+FORM = "application/x-www-form-urlencoded"
+
+
+def parse(body="Yksi - Kaksi 2-1", sender="+358401234567", content_type=FORM):
+    req = Request({"type": "http", "headers": [(b"content-type", content_type.encode())]})
+    return asyncio.run(parse_twilio_msg(req, body=body, sender=sender))
+
+
+def test_parse_twilio_msg():
+    msg = parse()
+    assert (msg.body, msg.sender, msg.is_test) == ("Yksi - Kaksi 2-1", "+358401234567", False)
+
+
+def test_test_messages_match_the_whole_word():
+    assert parse(body="TEST Yksi - Kaksi 2-1").is_test
+    assert parse(body="Yksi - Kaksi 2-1 (TEST)").is_test
+    assert not parse(body="CONTEST Yksi - Kaksi 2-1").is_test
+    assert not parse(body="Yksi - Kaksi 2-1 TESTI").is_test
+
+
+def test_content_type_may_have_parameters():
+    assert parse(content_type=f"{FORM}; charset=utf-8").body == "Yksi - Kaksi 2-1"
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "multipart/form-data", ""])
+def test_invalid_content_type_raises(content_type):
+    with pytest.raises(HTTPException) as exc:
+        parse(content_type=content_type)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("body,sender", [(None, "+358401234567"), ("Yksi - Kaksi 2-1", None), ("", "+358")])
+def test_missing_body_or_sender_raises(body, sender):
+    with pytest.raises(HTTPException) as exc:
+        parse(body=body, sender=sender)
+    assert exc.value.status_code == 400
+
+
+def test_twiml_reply_escapes_body():
+    assert twiml_reply("Yksi & Kaksi <2-1>") == (
+        '<?xml version="1.0" encoding="UTF-8"?><Response><Message>Yksi &amp; Kaksi &lt;2-1&gt;</Message></Response>'
+    )
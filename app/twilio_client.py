@@ -1,12 +1,23 @@
 import logging
 import os
+import re
 from collections import namedtuple
+from typing import Optional
 
+from fastapi import Form, HTTPException, Request, status
+
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
+from twilio.twiml.messaging_response import MessagingResponse
+
+FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+TEST_RE = re.compile(r"\bTEST\b")
 
 
 class Twilio:
     skip_send = os.environ.get("TWILIO_NO_SEND", False)
+    pool_size = 32  # keep-alive connections shared by concurrent sends
 
     def __init__(self, account_sid: str = None, auth_token: str = None, from_number: str = None):
         if not account_sid:
@@ -17,7 +28,9 @@ class Twilio:
             from_number = os.environ.get("TWILIO_FROM")
         if not account_sid or not auth_token or not from_number:
             raise ValueError("Missing Twilio credentials")
-        self.client = Client(account_sid, auth_token)
+        http_client = TwilioHttpClient(pool_connections=True)
+        http_client.session.mount("https://", HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size))
+        self.client = Client(account_sid, auth_token, http_client=http_client)
         self.from_number = from_number
         if self.skip_send:
             self.client.messages.create = self._skip_send_message
@@ -33,3 +46,27 @@ class Twilio:
 
 
 TwilioInboundMessage = namedtuple("TwilioInboundMessage", ["body", "sender", "is_test"])
+
+
+async def parse_twilio_msg(
+    req: Request,
+    body: Optional[str] = Form(None, alias="Body"),
+    sender: Optional[str] = Form(None, alias="From"),
+) -> TwilioInboundMessage:
+    """Returns inbound Twilio message details from request form data"""
+    # expect application/x-www-form-urlencoded, possibly followed by parameters such as charset
+    content_type = next((value for key, value in req.scope["headers"] if key == b"content-type"), b"")
+    if not content_type.startswith(FORM_CONTENT_TYPE):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Type")
+    # set is_test to True if the message contains the word TEST
+    is_test = bool(body and TEST_RE.search(body))
+    if not body or not sender:
+        raise HTTPException(status_code=400, detail="Invalid Twilio message")
+    return TwilioInboundMessage(body=body, sender=sender, is_test=is_test)
+
+
+def twiml_reply(body: str) -> str:
+    """Returns TwiML that makes Twilio reply to the inbound message with `body`."""
+    response = MessagingResponse()
+    response.message(body)
+    return str(response)